@@ -1,10 +1,24 @@
 # SPDX-License-Identifier: BSD-3-Clause
 import argparse
+import concurrent.futures
+import contextlib
+import functools
 import json
 import logging
 import os.path
+import stat
 import sys
 
+try:
+    import ijson
+except ImportError:  # ijson is an optional speedup, the stdlib json module always works
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup, the stdlib json module always works
+    orjson = None
+
 from operator_manifest.operator import ImageName, OperatorManifest
 from operator_manifest.resolver import resolve_image_reference
 
@@ -23,34 +37,72 @@ def main(args=None):
 
     parser = _make_parser()
     namespace = parser.parse_args(args)
-    if namespace.command == 'extract':
-        extract_image_references(namespace.manifest_dir, output=namespace.output)
-    elif namespace.command == 'resolve':
-        resolve_image_references(
-            namespace.images_file, authfile=namespace.authfile, output=namespace.output
-        )
-    elif namespace.command == 'replace':
-        replace_image_references(
-            namespace.manifest_dir, namespace.replacements_file, dry_run=namespace.dry_run
-        )
-    elif namespace.command == 'pin':
-        # pin_image_references requires that the output_* parameters are each a seekable file and
-        # will raise an error otherwise. In order to provide a more meaningful error to the user,
-        # we explicitly check for stdout since that's likely the only case where a non-seekable
-        # file is used from the CLI.
-        if namespace.output_replace.fileno() == sys.stdout.fileno():
-            raise ValueError('Cannot use stdout for --output-replace parameter')
-        if namespace.output_extract.fileno() == sys.stdout.fileno():
-            raise ValueError('Cannot use stdout for --output-extract parameter')
-        pin_image_references(
-            namespace.manifest_dir,
-            output_extract=namespace.output_extract,
-            output_replace=namespace.output_replace,
-            authfile=namespace.authfile,
-            dry_run=namespace.dry_run,
-        )
+    # Files are opened lazily, once the command is actually dispatched. Opening them at
+    # argument-parse time (e.g. via argparse.FileType) would truncate the output files even
+    # when the command errors out before using them.
+    with contextlib.ExitStack() as stack:
+        if namespace.command == 'extract':
+            output = _open_output(stack, namespace.output, 'w')
+            # The standalone extract command never writes the manifest back, so the
+            # faster read-only loader can be used
+            extract_image_references(namespace.manifest_dir, output=output, round_trip=False)
+        elif namespace.command == 'resolve':
+            images_file = _open_input(stack, namespace.images_file)
+            output = _open_output(stack, namespace.output, 'w+')
+            resolve_image_references(
+                images_file, authfile=namespace.authfile, output=output, jobs=namespace.jobs
+            )
+        elif namespace.command == 'replace':
+            replacements_file = _open_input(stack, namespace.replacements_file)
+            replace_image_references(
+                namespace.manifest_dir, replacements_file, dry_run=namespace.dry_run
+            )
+        elif namespace.command == 'pin':
+            # pin_image_references requires that the output_* parameters are each a seekable
+            # file and will raise an error otherwise. In order to provide a more meaningful
+            # error to the user, we explicitly reject stdout since that's likely the only case
+            # where a non-seekable file is used from the CLI.
+            if namespace.output_replace == '-':
+                raise ValueError('Cannot use stdout for --output-replace parameter')
+            if namespace.output_extract == '-':
+                raise ValueError('Cannot use stdout for --output-extract parameter')
+            output_extract = _open_output(stack, namespace.output_extract, 'w+')
+            output_replace = _open_output(stack, namespace.output_replace, 'w+')
+            pin_image_references(
+                namespace.manifest_dir,
+                output_extract=output_extract,
+                output_replace=output_replace,
+                authfile=namespace.authfile,
+                dry_run=namespace.dry_run,
+                jobs=namespace.jobs,
+            )
+        else:
+            parser.error('Insufficient parameters! See usage above')
+
+
+def _json_dump(data, output):
+    if orjson is not None:
+        output.write(orjson.dumps(data).decode('utf-8'))
     else:
-        parser.error('Insufficient parameters! See usage above')
+        json.dump(data, output)
+
+
+def _json_load(input_file):
+    if orjson is not None:
+        return orjson.loads(input_file.read())
+    return json.load(input_file)
+
+
+def _open_input(stack, path):
+    if path == '-':
+        return sys.stdin
+    return stack.enter_context(open(path, encoding='utf-8'))
+
+
+def _open_output(stack, path, mode):
+    if path == '-':
+        return sys.stdout
+    return stack.enter_context(open(path, mode, encoding='utf-8'))
 
 
 def _make_parser():
@@ -70,7 +122,6 @@ def _make_parser():
         '--output',
         metavar='OUTPUT',
         default='-',
-        type=argparse.FileType('w'),
         help=(
             'The path to store the extracted image references. Use - to specify stdout.'
             ' By default - is used.'
@@ -86,7 +137,6 @@ def _make_parser():
     resolve_parser.add_argument(
         'images_file',
         metavar='IMAGES_FILE',
-        type=argparse.FileType('r'),
         help=(
             'The path to the file containing the image references to be resolved. The format of'
             ' this file is a JSON Array of Strings where each item is an image reference. Use -'
@@ -97,7 +147,6 @@ def _make_parser():
         '--output',
         metavar='OUTPUT',
         default='-',
-        type=argparse.FileType('w+'),
         help=(
             'The path to store the image reference replacements. Use - to specify stdout.'
             ' By default - is used.'
@@ -108,6 +157,15 @@ def _make_parser():
         metavar='AUTHFILE',
         help='The path to the authentication file for registry communication.',
     )
+    resolve_parser.add_argument(
+        '--jobs',
+        metavar='JOBS',
+        type=int,
+        help=(
+            'The maximum number of image references to resolve concurrently. By default this'
+            ' is based on the number of image references to be resolved.'
+        ),
+    )
 
     replace_parser = subparsers.add_parser(
         'replace',
@@ -124,7 +182,6 @@ def _make_parser():
     replace_parser.add_argument(
         'replacements_file',
         metavar='REPLACEMENTS_FILE',
-        type=argparse.FileType('r'),
         help=(
             'The path to the replacements file. The format of this file is a simple JSON object'
             ' where each attribute is a string representing the original image reference and the'
@@ -166,7 +223,6 @@ def _make_parser():
         '--output-extract',
         metavar='OUTPUT_EXTRACT',
         default=DEFAULT_OUTPUT_EXTRACT,
-        type=argparse.FileType('w+'),
         help=(
             'The path to store the extracted image references from the CSVs.'
             f' By default {DEFAULT_OUTPUT_EXTRACT} is used.'
@@ -176,7 +232,6 @@ def _make_parser():
         '--output-replace',
         metavar='OUTPUT_REPLACE',
         default=DEFAULT_OUTPUT_REPLACE,
-        type=argparse.FileType('w+'),
         help=(
             'The path to store the extracted image reference replacements from the CSVs.'
             f' By default {DEFAULT_OUTPUT_REPLACE} is used.'
@@ -187,16 +242,27 @@ def _make_parser():
         metavar='AUTHFILE',
         help='The path to the authentication file for registry communication.',
     )
+    pin_parser.add_argument(
+        '--jobs',
+        metavar='JOBS',
+        type=int,
+        help=(
+            'The maximum number of image references to resolve concurrently. By default this'
+            ' is based on the number of image references to be resolved.'
+        ),
+    )
 
     return parser
 
 
-def extract_image_references(manifest_dir, output):
+def extract_image_references(manifest_dir, output, round_trip=True):
     """
     Identify all the image references from the CSVs found in manifest_dir.
 
     :param str manifest_dir: the path to the directory where the manifest files are stored
     :param file output: the file-like object to store the extracted image references
+    :param bool round_trip: whether to load the manifest with the round-trip YAML loader.
+        Callers that only extract can pass False for a faster read-only load
     :return: the list of image references extracted from the CSVs
     :rtype: list<str>
     :raises ValueError: if more than one CSV in manifest_dir
@@ -204,34 +270,86 @@ def extract_image_references(manifest_dir, output):
     abs_manifest_dir = _normalize_dir_path(manifest_dir)
     logger.info('Extracting image references from %s', abs_manifest_dir)
 
-    operator_manifest = OperatorManifest.from_directory(abs_manifest_dir)
-    image_references = [str(pullspec) for pullspec in operator_manifest.csv.get_pullspecs()]
+    operator_manifest = OperatorManifest.from_directory(abs_manifest_dir, round_trip=round_trip)
+    return _extract_image_references(operator_manifest, output)
 
-    json.dump(image_references, output)
+
+def _extract_image_references(operator_manifest, output):
+    """
+    Write the image references of an already parsed operator manifest to output.
+
+    :param OperatorManifest operator_manifest: the parsed operator manifest
+    :param file output: the file-like object to store the extracted image references
+    :return: the list of image references extracted from the CSVs
+    :rtype: list<str>
+    """
+    # Write each image reference as soon as it is extracted instead of buffering the full
+    # JSON document in memory before the first byte reaches the output.
+    image_references = []
+    output.write('[')
+    for pullspec in operator_manifest.csv.get_pullspecs():
+        if image_references:
+            output.write(', ')
+        image_reference = str(pullspec)
+        _json_dump(image_reference, output)
+        image_references.append(image_reference)
+    output.write(']')
 
     return image_references
 
 
-def resolve_image_references(images_file, output, authfile=None):
+def resolve_image_references(images_file, output, authfile=None, jobs=None):
     """
     Resolve the image references into their corresponding image reference digests.
 
-    :param file images_file: the file-like object to read the image references
+    Image references are resolved concurrently. Since each resolution is bound by registry
+    communication, the number of concurrent resolutions is only limited by the jobs parameter.
+
+    :param images_file: the file-like object to read the image references from, or an
+        already-decoded list of image reference strings
     :param file output: the file-like object to store the resolved image references
     :param str authfile: the path to the authentication file for registry communication
+    :param int jobs: the maximum number of image references to resolve concurrently
     :return: the dict of the original image references mapped to their resolved image references
     :rtype: dict<str:str>
     """
-    references = json.load(images_file)
+    if isinstance(images_file, list):
+        references = images_file
+    elif ijson is not None:
+        references = ijson.items(images_file, 'item')
+    else:
+        references = _json_load(images_file)
 
-    replacements = {}
-    for reference in references:
-        # Skip pinning of image references that already use digest
-        if '@' in reference:
-            continue
-        replacements[reference] = resolve_image_reference(reference, authfile=authfile)
+    replacements = _resolve_references(references, authfile=authfile, jobs=jobs)
+
+    _json_dump(replacements, output)
+
+    return replacements
+
+
+def _resolve_references(references, authfile=None, jobs=None):
+    """
+    Resolve the given image references into their corresponding image reference digests.
 
-    json.dump(replacements, output)
+    :param references: the iterable of image reference strings to resolve
+    :param str authfile: the path to the authentication file for registry communication
+    :param int jobs: the maximum number of image references to resolve concurrently
+    :return: the dict of the original image references mapped to their resolved image references
+    :rtype: dict<str:str>
+    """
+    # Skip pinning of image references that already use digest. Duplicate references are
+    # resolved only once; dict.fromkeys deduplicates while keeping the original order.
+    to_resolve = list(dict.fromkeys(ref for ref in references if '@' not in ref))
+
+    replacements = {}
+    if to_resolve:
+        max_workers = jobs or min(32, len(to_resolve))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            resolved = executor.map(
+                lambda reference: resolve_image_reference(reference, authfile=authfile),
+                to_resolve,
+            )
+            replacements = dict(zip(to_resolve, resolved))
 
     return replacements
 
@@ -241,10 +359,10 @@ def replace_image_references(manifest_dir, replacements_file, dry_run=False):
     Use replacements_file to modify the image references in the CSVs found in the manifest_dir.
 
     :param str manifest_dir: the path to the directory where the manifest files are stored
-    :param file replacements_file: the file-like object to the replacements file. The format of
-        this file is a simple JSON object where each attribute is a string representing the
-        original image reference and the value is a string representing the new value for the
-        image reference
+    :param replacements_file: the file-like object to the replacements file, or an
+        already-decoded dict. The format of the file is a simple JSON object where each
+        attribute is a string representing the original image reference and the value is
+        a string representing the new value for the image reference
     :param bool dry_run: whether or not to apply the replacements
     :raises ValueError: if more than one CSV in manifest_dir
     :raises ValueError: if validation fails
@@ -254,19 +372,51 @@ def replace_image_references(manifest_dir, replacements_file, dry_run=False):
 
     operator_manifest = OperatorManifest.from_directory(abs_manifest_dir)
 
+    if isinstance(replacements_file, dict):
+        items = replacements_file.items()
+    elif ijson is not None:
+        # Stream the key/value pairs instead of materializing the whole document first
+        items = ijson.kvitems(replacements_file, '')
+    else:
+        items = _json_load(replacements_file).items()
+
     replacements = {}
-    for k, v in json.load(replacements_file).items():
+    for k, v in items:
         replacements[ImageName.parse(k)] = ImageName.parse(v)
-        logger.info('%s -> %s', k, v)
+        logger.debug('%s -> %s', k, v)
 
-    operator_manifest.csv.replace_pullspecs_everywhere(replacements)
+    _apply_replacements(operator_manifest, replacements, dry_run=dry_run)
+
+
+def _apply_replacements(operator_manifest, replacements, dry_run=False):
+    """
+    Apply the given pullspec replacements to the CSV of operator_manifest.
+
+    :param OperatorManifest operator_manifest: the parsed operator manifest to modify
+    :param dict replacements: the dict of the original pullspecs mapped to their replacements,
+        both as ImageName objects
+    :param bool dry_run: whether or not to apply the replacements
+    """
+    if not replacements:
+        logger.info('No replacements to apply')
+        return
+
+    logger.info('Applying %d replacements', len(replacements))
+    replaced = operator_manifest.csv.replace_pullspecs_everywhere(replacements)
 
     logger.info('Setting related images section')
-    operator_manifest.csv.set_related_images()
+    related_images_changed = operator_manifest.csv.set_related_images()
 
-    if not dry_run:
-        operator_manifest.csv.dump()
-        logger.info('Image references replaced')
+    if dry_run:
+        return
+
+    if not replaced and not related_images_changed:
+        # Nothing in the document changed; skip rewriting the file
+        logger.info('Image references already match, nothing to replace')
+        return
+
+    operator_manifest.csv.dump()
+    logger.info('Image references replaced')
 
 
 def pin_image_references(
@@ -275,6 +425,7 @@ def pin_image_references(
     output_replace,
     authfile=None,
     dry_run=False,
+    jobs=None,
 ):
     """
     Pins to digest all the image references from the CSVs found in manifest_dir.
@@ -287,6 +438,7 @@ def pin_image_references(
     :param file output_replace: the file-like object to store the image reference replacements
     :param str authfile: the path to the authentication file for registry communication
     :param bool dry_run: whether or not to apply the replacements
+    :param int jobs: the maximum number of image references to resolve concurrently
     :raises ValueError: if more than one CSV in manifest_dir
     :raises ValueError: if validation fails
     """
@@ -295,20 +447,39 @@ def pin_image_references(
     if not output_extract.seekable():
         raise ValueError('output_extract must be a seekable object')
 
-    extract_image_references(manifest_dir, output=output_extract)
+    abs_manifest_dir = _normalize_dir_path(manifest_dir)
+    logger.info('Extracting image references from %s', abs_manifest_dir)
 
+    # The manifest is parsed once and shared between the extract and replace steps of
+    # this invocation. The intermediate results stay in memory; output_extract and
+    # output_replace are written purely as a record of the run and are never read back.
+    operator_manifest = OperatorManifest.from_directory(abs_manifest_dir)
+    image_references = _extract_image_references(operator_manifest, output_extract)
     output_extract.flush()
-    output_extract.seek(0)
-    resolve_image_references(output_extract, output_replace, authfile=authfile)
 
+    resolved = _resolve_references(image_references, authfile=authfile, jobs=jobs)
+    _json_dump(resolved, output_replace)
     output_replace.flush()
-    output_replace.seek(0)
-    replace_image_references(manifest_dir, output_replace, dry_run=dry_run)
+
+    logger.info('Replacing image references in CSV')
+    replacements = {}
+    for k, v in resolved.items():
+        replacements[ImageName.parse(k)] = ImageName.parse(v)
+        logger.debug('%s -> %s', k, v)
+
+    _apply_replacements(operator_manifest, replacements, dry_run=dry_run)
 
 
+@functools.lru_cache(maxsize=32)
 def _normalize_dir_path(path):
     abs_path = _normalize_path(path)
-    if not os.path.isdir(abs_path):
+    # A single stat call both confirms existence and checks the file type. Successful
+    # normalizations are cached; failures raise anew on every call.
+    try:
+        is_dir = stat.S_ISDIR(os.stat(abs_path).st_mode)
+    except OSError:
+        is_dir = False
+    if not is_dir:
         raise ValueError(f'{path} is not a directory or does not exist')
     return abs_path
 
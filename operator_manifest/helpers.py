@@ -1,9 +1,14 @@
+import functools
 import logging
 import json
 import jsonschema
 import codecs
 
-from pkg_resources import resource_stream
+try:
+    from importlib.resources import files as _resource_files
+except ImportError:  # importlib.resources.files was added in Python 3.9
+    from pkg_resources import resource_stream
+    _resource_files = None
 
 logger = logging.getLogger(__name__)
 
@@ -12,13 +17,20 @@ class ValidationException(Exception):
     pass
 
 
+@functools.lru_cache(maxsize=16)
 def load_schema(schema_path, package='operator_manifest'):
     """
     :param schema_path: string, file path to the JSON schema
+
+    The decoded schema is cached per (schema_path, package); callers must not
+    mutate the returned dict.
     """
     # Read schema from file
     try:
-        resource = resource_stream(package, schema_path)
+        if _resource_files is not None:
+            resource = _resource_files(package).joinpath(schema_path).open('rb')
+        else:
+            resource = resource_stream(package, schema_path)
         schema = codecs.getreader('utf-8')(resource)
     except ImportError:
         logger.error('Unable to find package %s', package)
@@ -36,15 +48,32 @@ def load_schema(schema_path, package='operator_manifest'):
     return schema
 
 
+@functools.lru_cache(maxsize=None)
+def _get_validator(schema_path):
+    """
+    Build a validator for the schema at schema_path, reusing previously built validators.
+
+    Loading and checking a schema is much more expensive than validating a typical document
+    against it, and the same few bundled schemas are validated against over and over.
+
+    :param schema_path: string, file path to the JSON schema
+    """
+    schema = load_schema(schema_path)
+    # Pick the validator class matching the schema's $schema declaration; schemas without one
+    # get the latest supported draft, whose implementation is considerably faster than Draft 4
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator = validator_cls(schema=schema)
+    validator_cls.check_schema(schema)
+    return validator
+
+
 def validate_with_schema(data, schema_path):
     """
     :param data: dict, data to be validated
     :param schema_path: string, file path to the JSON schema
     """
-    schema = load_schema(schema_path)
-    validator = jsonschema.Draft4Validator(schema=schema)
     try:
-        jsonschema.Draft4Validator.check_schema(schema)
+        validator = _get_validator(schema_path)
         validator.validate(data)
     except jsonschema.SchemaError:
         logger.error('invalid schema, cannot validate')
@@ -52,9 +81,12 @@ def validate_with_schema(data, schema_path):
     except jsonschema.ValidationError as exc:
         logger.debug("schema validation error: %s", exc)
         exc_message = get_error_message(exc)
-        for error in validator.iter_errors(data):
-            error_message = get_error_message(error)
-            logger.debug("validation error: %s", error_message)
+        # Enumerating every validation error is only worth the extra full-document pass
+        # when debug logging is actually on
+        if logger.isEnabledFor(logging.DEBUG):
+            for error in validator.iter_errors(data):
+                error_message = get_error_message(error)
+                logger.debug("validation error: %s", error_message)
         raise ValidationException(exc_message)
 
 
@@ -65,9 +97,7 @@ def get_error_message(error):
     )
 
     # receive all context messages without duplicates caused by the validator 'anyOf'
-    error_contexts = set()
-    for context in error.context:
-        error_contexts.add(context.message)
+    error_contexts = {context.message for context in error.context}
 
     error_message = "{}: validating '{}' has failed ({})".format(
                     path or 'at top level', error.validator,
@@ -1,43 +1,100 @@
 # SPDX-License-Identifier: BSD-3-Clause
+import concurrent.futures
+import functools
+import itertools
 import os
 import re
 import logging
-from collections import OrderedDict
+import string
+import threading
+
+try:
+    import re2
+except ImportError:  # optional DFA-based regex engine, used for candidate scanning
+    re2 = None
 
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedMap, CommentedSeq
+from ruamel.yaml.events import (
+    AliasEvent,
+    MappingEndEvent,
+    MappingStartEvent,
+    ScalarEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+)
 from operator_manifest.helpers import validate_with_schema
 
 
-yaml = YAML()
-# ruamel will introduce a line break if the yaml line is longer than
-# yaml.width. Unfortunately, this causes issues for JSON values nested
-# within a YAML file, e.g. metadata.annotations."alm-examples" in a CSV
-# file. The default value is 80. Set it to a more forgivinng higher
-# number to avoid issues
-yaml.width = 200
-# ruamel will also cause issues when normalizing a YAML object that contains
-# a nested JSON object when it does not preserve quotes. Thus, it produces
-# invalid YAML. Let's prevent this from happening at all.
-yaml.preserve_quotes = True
+def _make_yaml(round_trip=True):
+    if round_trip:
+        y = YAML()
+        # ruamel will introduce a line break if the yaml line is longer than
+        # yaml.width. Unfortunately, this causes issues for JSON values nested
+        # within a YAML file, e.g. metadata.annotations."alm-examples" in a CSV
+        # file. The default value is 80. Set it to a more forgivinng higher
+        # number to avoid issues
+        y.width = 200
+        # ruamel will also cause issues when normalizing a YAML object that contains
+        # a nested JSON object when it does not preserve quotes. Thus, it produces
+        # invalid YAML. Let's prevent this from happening at all.
+        y.preserve_quotes = True
+    else:
+        # Round-trip loading builds a comment-preserving tree, which is expensive. For
+        # read-only uses (scanning a directory for CSVs, extracting pullspecs) the safe
+        # loader is much faster and produces plain dicts and lists.
+        y = YAML(typ='safe')
+    return y
+
+
+yaml = _make_yaml()
+yaml_safe = _make_yaml(round_trip=False)
+
+# YAML instances keep parser state while loading, so they must not be shared between
+# threads; each thread gets its own lazily created pair
+_thread_yaml = threading.local()
+
+
+def _get_thread_yaml(round_trip=True):
+    attr = 'round_trip' if round_trip else 'safe'
+    loader = getattr(_thread_yaml, attr, None)
+    if loader is None:
+        loader = _make_yaml(round_trip)
+        setattr(_thread_yaml, attr, loader)
+    return loader
+
+
 log = logging.getLogger(__name__)
 
 
 OPERATOR_CSV_KIND = "ClusterServiceVersion"
 
+# Paths of the predefined pullspec locations within a CSV document
+_RELATED_IMAGES_PATH = ("spec", "relatedImages")
+_DEPLOYMENTS_PATH = ("spec", "install", "spec", "deployments")
+_CONTAINERS_PATH = ("spec", "template", "spec", "containers")
+_INIT_CONTAINERS_PATH = ("spec", "template", "spec", "initContainers")
+
+_MISSING = object()
+
+# Type tuples for isinstance checks; hot tree-walking loops use these directly to
+# avoid a function call per visited node
+_DICT_TYPES = (dict, CommentedMap)
+_LIST_TYPES = (list, CommentedSeq)
+
 
 def is_dict(obj):
     """
     Check if object is a dict or the ruamel.yaml equivalent of a dict
     """
-    return isinstance(obj, (dict, CommentedMap))
+    return isinstance(obj, _DICT_TYPES)
 
 
 def is_list(obj):
     """
     Check if object is a list or the ruamel.yaml equivalent of a list
     """
-    return isinstance(obj, (list, CommentedSeq))
+    return isinstance(obj, _LIST_TYPES)
 
 
 def is_str(obj):
@@ -102,6 +159,76 @@ class PullspecRegex(object):
     PULLSPEC = re.compile(_pullspec)
 
 
+# Prebound method of the compiled pattern; the heuristic calls this in a tight loop
+# for every annotation string. The candidate pattern is a plain character class, which
+# the DFA-based re2 engine scans much faster than re - use it when available.
+if re2 is not None:
+    _CANDIDATE_FINDITER = re2.compile(PullspecRegex.CANDIDATE.pattern).finditer
+else:
+    _CANDIDATE_FINDITER = PullspecRegex.CANDIDATE.finditer
+
+# Explicit ASCII character sets mirroring PullspecRegex; str.isalnum & friends accept
+# all of Unicode and must not be used here
+_ALNUM_CHARS = frozenset(string.ascii_letters + string.digits)
+_NAME_CHARS = _ALNUM_CHARS | frozenset('-._')
+_BASE16_CHARS = frozenset(string.hexdigits)
+_DIGIT_CHARS = frozenset(string.digits)
+
+
+def _is_basic_name(s):
+    return (
+        bool(s)
+        and s[0] in _ALNUM_CHARS
+        and s[-1] in _ALNUM_CHARS
+        and _NAME_CHARS.issuperset(s)
+    )
+
+
+def _is_registry(s):
+    host, sep, port = s.partition(':')
+    if sep and not (port and _DIGIT_CHARS.issuperset(port)):
+        return False
+    return (
+        len(host) >= 3
+        and host[0] in _ALNUM_CHARS
+        and host[-1] in _ALNUM_CHARS
+        and '.' in host[1:-1]
+        and _NAME_CHARS.issuperset(host)
+    )
+
+
+def _is_repo(s):
+    at = s.find('@')
+    if at != -1:
+        name, digest = s[:at], s[at + 1:]
+        # "sha256:" followed by exactly 64 base16 characters
+        return (
+            _is_basic_name(name)
+            and len(digest) == 71
+            and digest.startswith('sha256:')
+            and _BASE16_CHARS.issuperset(digest[7:])
+        )
+    name, sep, tag = s.partition(':')
+    return bool(sep) and _is_basic_name(name) and _is_basic_name(tag)
+
+
+def _is_pullspec(s):
+    """
+    Structural equivalent of matching against PullspecRegex.FULL.
+
+    The pullspec grammar needs no backtracking: split on '/', check each segment with
+    cheap character-set lookups. This is considerably faster than the regex engine for
+    candidate validation, where the vast majority of inputs are rejections.
+    """
+    parts = s.split('/')
+    if len(parts) < 2 or not _is_registry(parts[0]):
+        return False
+    for namespace in parts[1:-1]:
+        if not _is_basic_name(namespace):
+            return False
+    return _is_repo(parts[-1])
+
+
 def default_pullspec_heuristic(text):
     """
     Attempts to find all pullspecs in arbitrary structured/unstructured text.
@@ -137,24 +264,27 @@ def default_pullspec_heuristic(text):
     for i, j in _pullspec_candidates(text):
         i, j = _adjust_for_arbitrary_text(text, i, j)
         candidate = text[i:j]
-        if PullspecRegex.FULL.match(candidate):
+        if _is_pullspec(candidate):
             pullspecs.append((i, j))
             log.debug("Pullspec heuristic: %s looks like a pullspec", candidate)
     return pullspecs
 
 
 def _pullspec_candidates(text):
-    return (match.span() for match in PullspecRegex.CANDIDATE.finditer(text))
+    return (match.span() for match in _CANDIDATE_FINDITER(text))
+
+
+# The only non-alphanumeric characters a candidate can contain, see PullspecRegex.CANDIDATE
+_STRIP_CHARS = '/-._@:'
 
 
 def _adjust_for_arbitrary_text(text, i, j):
     # Strip all non-alphanumeric characters from start and end of pullspec
     # candidate to account for various structured/unstructured text elements
-    while i < len(text) and not text[i].isalnum():
-        i += 1
-    while j > 0 and not text[j - 1].isalnum():
-        j -= 1
-    return i, j
+    snippet = text[i:j]
+    new_i = i + (len(snippet) - len(snippet.lstrip(_STRIP_CHARS)))
+    new_j = new_i + len(snippet.strip(_STRIP_CHARS))
+    return new_i, new_j
 
 
 class NotOperatorCSV(Exception):
@@ -168,16 +298,24 @@ class NamedPullspec(object):
     Pullspec with a name and description
     """
 
-    _image_key = "image"
+    # __slots__ saves the per-instance __dict__; many of these objects are created
+    # when scanning a CSV
+    __slots__ = ('data', '_image_key')
+
+    # Key under which subclasses find the image by default
+    _default_image_key = "image"
 
-    def __init__(self, data):
+    def __init__(self, data, image_key=None):
         """
         Initialize a NamedPullspec
 
         :param data: Dict-like object in JSON/YAML data
                      in which the name and image can be found
+        :param image_key: Key under which the image is found. Defaults to the
+                          class-specific key
         """
         self.data = data
+        self._image_key = image_key or self._default_image_key
 
     @property
     def name(self):
@@ -201,29 +339,41 @@ class NamedPullspec(object):
 
         :return: dict-like object compatible with ruamel.yaml
         """
-        return CommentedMap([("name", self.name), ("image", self.image)])
+        # Only build ruamel's CommentedMap when the source document is itself a
+        # round-trip tree; plain dicts are much cheaper and dump identically
+        if isinstance(self.data, CommentedMap):
+            return CommentedMap([("name", self.name), ("image", self.image)])
+        return {"name": self.name, "image": self.image}
 
 
 class Container(NamedPullspec):
+    __slots__ = ()
+
     @property
     def description(self):
         return "container {}".format(self.name)
 
 
 class InitContainer(NamedPullspec):
+    __slots__ = ()
+
     @property
     def description(self):
         return "initContainer {}".format(self.name)
 
 
 class RelatedImage(NamedPullspec):
+    __slots__ = ()
+
     @property
     def description(self):
         return "relatedImage {}".format(self.name)
 
 
 class RelatedImageEnv(NamedPullspec):
-    _image_key = "value"
+    __slots__ = ()
+
+    _default_image_key = "value"
 
     @property
     def name(self):
@@ -241,11 +391,22 @@ class Annotation(NamedPullspec):
     and there may be more than one pullspec under a single key
     """
 
-    def __init__(self, data):
-        super(Annotation, self).__init__(data)
-        self._image_key = NotImplemented
-        self._start_i = NotImplemented
-        self._end_i = NotImplemented
+    __slots__ = ('_start_i', '_end_i')
+
+    def __init__(self, data, image_key, start=None, end=None):
+        """
+        Initialize an Annotation
+
+        :param data: Dict-like object in which the annotation is found
+        :param image_key: Key of the annotation that holds the pullspec
+        :param start: Index in the annotation text where the pullspec starts;
+                      defaults to the start of the text
+        :param end: Index just past the end of the pullspec; defaults to the
+                    end of the text
+        """
+        super(Annotation, self).__init__(data, image_key)
+        self._start_i = start or 0
+        self._end_i = end or len(data[image_key])
 
     @property
     def image(self):
@@ -276,12 +437,6 @@ class Annotation(NamedPullspec):
     def description(self):
         return "{} annotation".format(self._image_key)
 
-    def in_key(self, image_key, start=None, end=None):
-        self._image_key = image_key
-        self._start_i = start or 0
-        self._end_i = end or len(self.data[image_key])
-        return self
-
 
 class OperatorCSV(object):
     """
@@ -309,17 +464,24 @@ class OperatorCSV(object):
         self.path = path
         self.data = data
         self._pullspec_heuristic = pullspec_heuristic
+        self._named_pullspecs_cache = None
+        self._annotations_cache = None
+        self._deployment_pullspecs_cache = None
 
     @classmethod
-    def from_file(cls, path, **kwargs):
+    def from_file(cls, path, round_trip=True, **kwargs):
         """
         Make an OperatorCSV from a file
 
         :param path: Path to file
+        :param round_trip: If True (the default), load with the round-trip loader so
+            that dump() preserves comments and quotes. If False, use the much faster
+            safe loader; suitable when the CSV is only read, never dumped
         :return: OperatorCSV
         """
+        loader = _get_thread_yaml(round_trip)
         with open(path) as f:
-            data = yaml.load(f)
+            data = loader.load(f)
             return cls(path, data, **kwargs)
 
     def dump(self):
@@ -329,17 +491,66 @@ class OperatorCSV(object):
         with open(self.path, "w") as f:
             yaml.dump(self.data, f)
 
+    @classmethod
+    def quick_has_related_images(cls, path):
+        """
+        Check whether the file at path has a non-empty spec.relatedImages section.
+
+        Streams parser events instead of building the document tree and stops as soon
+        as the answer is known, so memory use is constant and large deployments
+        sections are never materialized. Does not validate that the file is a CSV.
+
+        :param path: Path to file
+        :return: bool
+        """
+        loader = _get_thread_yaml(round_trip=False)
+        with open(path) as f:
+            # Each stack entry tracks one open collection:
+            # [is_mapping, current key, whether the next scalar is a key]
+            stack = []
+            watching = False
+            for event in loader.parse(f):
+                if watching:
+                    # The first event inside spec.relatedImages decides the answer
+                    return not isinstance(event, SequenceEndEvent)
+                if isinstance(event, (ScalarEvent, AliasEvent)):
+                    if stack and stack[-1][0]:
+                        if stack[-1][2]:
+                            value = event.value if isinstance(event, ScalarEvent) else None
+                            stack[-1][1] = value
+                            stack[-1][2] = False
+                        else:
+                            stack[-1][2] = True
+                elif isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+                    if (
+                        isinstance(event, SequenceStartEvent)
+                        and len(stack) == 2
+                        and stack[0][0] and stack[0][1] == "spec"
+                        and stack[1][0] and stack[1][1] == "relatedImages"
+                    ):
+                        watching = True
+                        continue
+                    stack.append([isinstance(event, MappingStartEvent), None, True])
+                elif isinstance(event, (MappingEndEvent, SequenceEndEvent)):
+                    stack.pop()
+                    if stack and stack[-1][0]:
+                        stack[-1][2] = True
+        return False
+
     def has_related_images(self):
         """
         Check if OperatorCSV has a non-empty relatedImages section.
         """
-        return bool(self._related_image_pullspecs())
+        return any(True for _ in self._related_image_pullspecs())
 
     def has_related_image_envs(self):
         """
         Check if OperatorCSV has any RELATED_IMAGE_* env vars.
         """
-        return bool(self._related_image_env_pullspecs())
+        # Drain the generator rather than short-circuiting on the first match: every
+        # env var must be validated so that an unsupported "valueFrom" reference
+        # raises no matter where it appears
+        return bool(list(self._related_image_env_pullspecs()))
 
     def get_pullspecs(self):
         """
@@ -359,33 +570,88 @@ class OperatorCSV(object):
         Replace pullspecs in predefined locations.
 
         :param replacement_pullspecs: mapping of pullspec -> replacement
+        :return: number of replacements performed
+        :rtype: int
         """
+        if not replacement_pullspecs:
+            return 0
+        replaced = 0
         for p in self._named_pullspecs():
-            self._replace_named_pullspec(p, replacement_pullspecs)
+            replaced += self._replace_named_pullspec(p, replacement_pullspecs)
+        self._named_pullspecs_cache = None
+        self._annotations_cache = None
+        self._deployment_pullspecs_cache = None
+        return replaced
 
     def replace_pullspecs_everywhere(self, replacement_pullspecs):
         """
         Replace all pullspecs found anywhere in data
 
         :param replacement_pullspecs: mapping of pullspec -> replacment
+        :return: number of replacements performed
+        :rtype: int
         """
-        for k in self.data:
-            self._replace_pullspecs_not_in_annotations(self.data, k, replacement_pullspecs)
-        for annotation in self._annotation_pullspecs() + self._guess_annotation_pullspecs():
-            self._replace_named_pullspec(annotation, replacement_pullspecs)
+        if not replacement_pullspecs:
+            return 0
+        replaced = 0
+
+        # Every string that could parse to one of the replaced pullspecs; most string
+        # leaves in a CSV are not pullspecs and a set lookup rejects them without the
+        # cost of a full parse
+        old_strs = set()
+        for old in replacement_pullspecs:
+            old_strs.add(old.to_str())
+            if old.tag == 'latest':
+                old_strs.add(old.to_str(tag=False))
+
+        # Iterative traversal; each (container, key) pair is visited once and the item
+        # is fetched a single time, avoiding per-node call-frame and getitem overhead
+        stack = [(self.data, k) for k in self.data]
+        while stack:
+            obj, k_or_i = stack.pop()
+            item = obj[k_or_i]
+            if isinstance(item, _DICT_TYPES):
+                for k in item:
+                    # Do not descend into metadata.annotations objects
+                    if (k_or_i, k) != ("metadata", "annotations"):
+                        stack.append((item, k))
+            elif isinstance(item, _LIST_TYPES):
+                stack.extend((item, i) for i in range(len(item)))
+            elif isinstance(item, str):
+                # Doesn't matter if string was not a pullspec, it will simply not match
+                # anything in replacement_pullspecs and no replacement will be done
+                if item not in old_strs:
+                    continue
+                old = ImageName.parse(item)
+                new = replacement_pullspecs.get(old)
+                if new is not None and new != old:
+                    log.debug("%s - Replaced pullspec: %s -> %s", self.path, old, new)
+                    obj[k_or_i] = new.to_str()  # `new` is an ImageName
+                    replaced += 1
+        for annotation in self._all_annotation_pullspecs():
+            replaced += self._replace_named_pullspec(annotation, replacement_pullspecs)
+        self._named_pullspecs_cache = None
+        self._annotations_cache = None
+        self._deployment_pullspecs_cache = None
+        return replaced
 
     def set_related_images(self):
         """
         Find pullspecs in predefined locations and put all of them in the
         .spec.relatedImages section (if it already exists, clear it first)
+
+        :return: whether the relatedImages section differs from its previous content
+        :rtype: bool
         """
         named_pullspecs = self._named_pullspecs()
 
         if not named_pullspecs:
             log.info("No pullspecs, skipping updates of relatedImages section")
-            return
+            return False
 
-        by_name = OrderedDict()
+        # Plain dicts preserve insertion order since Python 3.7 and setdefault is faster
+        # than on an OrderedDict
+        by_name = {}
         conflicts = []
 
         for new in named_pullspecs:
@@ -395,45 +661,65 @@ class OperatorCSV(object):
             old = by_name.setdefault(new.name, new)
             # Check for potential conflict (same name, different image)
             if new.image != old.image:
-                msg = ("{old.description}: {old.image} X {new.description}: {new.image}"
-                       .format(old=old, new=new))
-                conflicts.append(msg)
+                conflicts.append(f"{old.description}: {old.image} X "
+                                 f"{new.description}: {new.image}")
 
         if conflicts:
             raise RuntimeError("{} - Found conflicts when setting relatedImages:\n{}"
                                .format(self.path, "\n".join(conflicts)))
 
-        related_images = (self.data.setdefault("spec", CommentedMap())
-                                   .setdefault("relatedImages", CommentedSeq()))
+        if isinstance(self.data, CommentedMap):
+            map_factory, seq_factory = CommentedMap, CommentedSeq
+        else:
+            map_factory, seq_factory = dict, list
+        related_images = (self.data.setdefault("spec", map_factory())
+                                   .setdefault("relatedImages", seq_factory()))
+        previous = list(related_images)
         del related_images[:]
 
         for p in by_name.values():
             log.debug("%s - Set relatedImage %s (from %s): %s",
                       self.path, p.name, p.description, p.image)
             related_images.append(p.as_yaml_object())
+        self._named_pullspecs_cache = None
+        self._annotations_cache = None
+        self._deployment_pullspecs_cache = None
+        return list(related_images) != previous
 
     def _named_pullspecs(self):
-        pullspecs = []
+        # Several public methods query the pullspecs of the same unchanged document in a
+        # row; cache the collected list and drop it whenever self.data is mutated. The
+        # cache must not survive mutations: Annotation pullspecs carry (start, end)
+        # indices into the annotation text which go stale once the text is rewritten
+        if self._named_pullspecs_cache is None:
+            self._named_pullspecs_cache = self._collect_named_pullspecs()
+        return self._named_pullspecs_cache
+
+    def _collect_named_pullspecs(self):
+        # Compute the container lists once; _related_image_env_pullspecs reuses them
+        # instead of walking all deployments a second time
+        containers, init_containers = self._deployment_pullspecs()
+
         # relatedImages should come first in the list
-        pullspecs.extend(self._related_image_pullspecs())
-        pullspecs.extend(self._annotation_pullspecs())
-        pullspecs.extend(self._container_pullspecs())
-        pullspecs.extend(self._init_container_pullspecs())
-        pullspecs.extend(self._related_image_env_pullspecs())
-        pullspecs.extend(self._guess_annotation_pullspecs())
-        return pullspecs
+        return list(itertools.chain(
+            self._related_image_pullspecs(),
+            self._annotation_pullspecs(),
+            containers,
+            init_containers,
+            self._related_image_env_pullspecs(containers + init_containers),
+            self._guess_annotation_pullspecs(),
+        ))
 
     def _related_image_pullspecs(self):
-        """Get the pullspecs from spec.relatedImages section
+        """Iterate over the pullspecs from the spec.relatedImages section
 
-        :return: a list of pullspecs. It could be an empty if no spec.RelatedImage section.
-        :rtype: list[RelatedImage]
+        :return: an iterator of pullspecs. It is empty if no spec.relatedImages section.
+        :rtype: Iterator[RelatedImage]
         """
-        related_images_path = ("spec", "relatedImages")
-        return [
+        return (
             RelatedImage(r)
-            for r in chain_get(self.data, related_images_path, default=[])
-        ]
+            for r in chain_get(self.data, _RELATED_IMAGES_PATH, default=[])
+        )
 
     def get_related_image_pullspecs(self):
         """Get the related image pullspecs
@@ -446,77 +732,101 @@ class OperatorCSV(object):
                 for related_image in self._related_image_pullspecs()]
 
     def _deployments(self):
-        deployments_path = ("spec", "install", "spec", "deployments")
-        return chain_get(self.data, deployments_path, default=[])
+        return chain_get(self.data, _DEPLOYMENTS_PATH, default=[])
+
+    def _deployment_pullspecs(self):
+        """Collect containers and initContainers in one pass over the deployments."""
+        # Memoized on the instance; invalidated together with the named pullspec cache
+        if self._deployment_pullspecs_cache is None:
+            containers = []
+            init_containers = []
+            for d in self._deployments():
+                containers.extend(
+                    Container(c) for c in chain_get(d, _CONTAINERS_PATH, default=[])
+                )
+                init_containers.extend(
+                    InitContainer(c) for c in chain_get(d, _INIT_CONTAINERS_PATH, default=[])
+                )
+            self._deployment_pullspecs_cache = (containers, init_containers)
+        return self._deployment_pullspecs_cache
 
     def _container_pullspecs(self):
-        deployments = self._deployments()
-        containers_path = ("spec", "template", "spec", "containers")
-        return [
-            Container(c)
-            for d in deployments for c in chain_get(d, containers_path, default=[])
-        ]
+        return self._deployment_pullspecs()[0]
+
+    def _all_annotation_pullspecs(self):
+        # Single pass over each annotation object for replacement purposes. A key is
+        # either a known pullspec source or scanned with the heuristic, never both, and
+        # replacements in distinct keys are independent, so collecting both families
+        # together is equivalent to the two separate scans. Heuristic hits are emitted
+        # right-to-left, the order their spans must be replaced in
+        for obj in self._all_annotation_objects():
+            for k, v in obj.items():
+                if k in self._known_annotation_keys:
+                    yield Annotation(obj, k)
+                elif is_str(v):
+                    for i, j in reversed(self._pullspec_heuristic(v)):
+                        yield Annotation(obj, k, i, j)
 
     def _annotation_pullspecs(self):
         # Known sources of pullspecs in annotations
-        pullspecs = []
-        annotation_objects = self._find_all_annotations(self.data)
-        for obj in annotation_objects:
+        for obj in self._all_annotation_objects():
             for key in self._known_annotation_keys:
                 if key in obj:
-                    pullspecs.append(Annotation(obj).in_key(key))
-        return pullspecs
-
-    def _related_image_env_pullspecs(self):
-        containers = self._container_pullspecs() + self._init_container_pullspecs()
-        envs = [
-            e for c in containers
-            for e in c.data.get("env", []) if e["name"].startswith("RELATED_IMAGE_")
-        ]
-        for env in envs:
-            if "valueFrom" in env:
-                msg = '{}: "valueFrom" references are not supported'.format(env["name"])
-                raise RuntimeError(msg)
-        return [
-            RelatedImageEnv(env) for env in envs
-        ]
+                    yield Annotation(obj, key)
+
+    def _related_image_env_pullspecs(self, containers=None):
+        if containers is None:
+            containers = self._container_pullspecs() + self._init_container_pullspecs()
+        prefix = "RELATED_IMAGE_"
+        for c in containers:
+            for env in c.data.get("env", []):
+                if not env["name"].startswith(prefix):
+                    continue
+                if "valueFrom" in env:
+                    msg = '{}: "valueFrom" references are not supported'.format(env["name"])
+                    raise RuntimeError(msg)
+                yield RelatedImageEnv(env)
 
     def _init_container_pullspecs(self):
-        deployments = self._deployments()
-        init_containers_path = ("spec", "template", "spec", "initContainers")
-        return [
-            InitContainer(c)
-            for d in deployments for c in chain_get(d, init_containers_path, default=[])
-        ]
+        return self._deployment_pullspecs()[1]
 
     def _guess_annotation_pullspecs(self):
         # Other sources of pullspecs in annotations
         maybe_pullspecs = []
-        annotation_objects = self._find_all_annotations(self.data)
-        for obj in annotation_objects:
-            for k, v in obj.items():
+        annotation_objects = self._all_annotation_objects()
+        # Pullspecs are found left-to-right, they *must* be replaced right-to-left;
+        # reversing every level of the iteration builds the list directly in that order
+        for obj in reversed(annotation_objects):
+            for k, v in reversed(list(obj.items())):
                 # Do not look in keys that are known pullspec sources
                 if is_str(v) and k not in self._known_annotation_keys:
-                    for i, j in self._pullspec_heuristic(v):
-                        maybe_pullspecs.append(Annotation(obj).in_key(k, i, j))
-        # Pullspecs are found left-to-right, they *must* be replaced right-to-left
-        maybe_pullspecs.reverse()
+                    for i, j in reversed(self._pullspec_heuristic(v)):
+                        maybe_pullspecs.append(Annotation(obj, k, i, j))
         return maybe_pullspecs
 
-    def _find_all_annotations(self, obj):
-        if is_dict(obj):
-            metadata = obj.get("metadata")
-            if metadata is not None and "annotations" in metadata:
-                yield metadata["annotations"]
-            for k, v in obj.items():
-                # Do not search for metadata.*.metadata.annotations
-                if k != "metadata":
-                    for annotation in self._find_all_annotations(v):
-                        yield annotation
-        elif is_list(obj):
-            for item in obj:
-                for annotation in self._find_all_annotations(item):
-                    yield annotation
+    def _all_annotation_objects(self):
+        # Both annotation scans walk the whole tree for the same annotation objects;
+        # walk it once with an explicit stack and cache the result. Replacements mutate
+        # the annotation objects in place, so the cached list itself never goes stale,
+        # but it is invalidated along with the pullspec cache anyway for simplicity
+        if self._annotations_cache is None:
+            annotations = []
+            stack = [self.data]
+            while stack:
+                obj = stack.pop()
+                if isinstance(obj, _DICT_TYPES):
+                    metadata = obj.get("metadata")
+                    if metadata is not None and "annotations" in metadata:
+                        annotations.append(metadata["annotations"])
+                    # Do not search for metadata.*.metadata.annotations; children are
+                    # pushed in reverse to preserve the original depth-first order
+                    children = [v for k, v in obj.items() if k != "metadata"]
+                    children.reverse()
+                    stack.extend(children)
+                elif isinstance(obj, _LIST_TYPES):
+                    stack.extend(reversed(obj))
+            self._annotations_cache = annotations
+        return self._annotations_cache
 
     def _replace_named_pullspec(self, pullspec, replacement_pullspecs):
         old = ImageName.parse(pullspec.image)
@@ -525,28 +835,8 @@ class OperatorCSV(object):
             log.debug("%s - Replaced pullspec for %s: %s -> %s",
                       self.path, pullspec.description, old, new)
             pullspec.image = new.to_str()  # `new` is an ImageName
-
-    def _replace_unnamed_pullspec(self, obj, key, replacement_pullspecs):
-        old = ImageName.parse(obj[key])
-        new = replacement_pullspecs.get(old)
-        if new is not None and new != old:
-            log.debug("%s - Replaced pullspec: %s -> %s", self.path, old, new)
-            obj[key] = new.to_str()  # `new` is an ImageName
-
-    def _replace_pullspecs_not_in_annotations(self, obj, k_or_i, replacements):
-        item = obj[k_or_i]
-        if is_dict(item):
-            for k in item:
-                # Do not descend into metadata.annotations objects
-                if (k_or_i, k) != ("metadata", "annotations"):
-                    self._replace_pullspecs_not_in_annotations(item, k, replacements)
-        elif is_list(item):
-            for i in range(len(item)):
-                self._replace_pullspecs_not_in_annotations(item, i, replacements)
-        elif is_str(item):
-            # Doesn't matter if string was not a pullspec, it will simply not match anything
-            # in replacement_pullspecs and no replacement will be done
-            self._replace_unnamed_pullspec(obj, k_or_i, replacements)
+            return True
+        return False
 
 
 class OperatorManifest(object):
@@ -600,59 +890,87 @@ class OperatorManifest(object):
 
     @classmethod
     def _get_yaml_files(cls, dirpath):
-        for d, _, files in os.walk(dirpath):
-            for f in files:
-                if f.endswith(".yaml") or f.endswith(".yml"):
-                    yield os.path.join(d, f)
+        # os.scandir reuses the file type from the directory listing, avoiding the
+        # per-entry stat calls that os.walk + os.path.join would incur
+        with os.scandir(dirpath) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from cls._get_yaml_files(entry.path)
+                elif entry.is_file() and entry.name.endswith((".yaml", ".yml")):
+                    yield entry.path
+
+    # A top-level "kind: <value>" line is enough to tell most non-CSV files apart
+    # without parsing them
+    _kind_line_re = re.compile(r'^kind:[ \t]*["\']?(\w+)["\']?[ \t]*$', re.MULTILINE)
 
     @classmethod
     def _get_csvs(cls, yaml_files, **kwargs):
-        for f in yaml_files:
+        candidates = [f for f in yaml_files if cls._might_be_csv(f)]
+
+        def try_parse(f):
             try:
-                yield OperatorCSV.from_file(f, **kwargs)
+                return OperatorCSV.from_file(f, **kwargs)
             except NotOperatorCSV:
-                pass
+                return None
+
+        if len(candidates) > 1:
+            # Parsing is CPU and I/O bound per file with no shared state (each thread
+            # uses its own YAML loader), so overlap the files across a small pool.
+            # executor.map preserves the input order
+            max_workers = min(8, os.cpu_count() or 1)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                csvs = list(executor.map(try_parse, candidates))
+        else:
+            csvs = [try_parse(f) for f in candidates]
+        return (csv for csv in csvs if csv is not None)
+
+    @classmethod
+    def _might_be_csv(cls, path):
+        """
+        Cheaply decide whether a file could be a CSV by peeking at its first 4KB.
+
+        Only a clear top-level "kind:" line with a different value rules a file out;
+        anything inconclusive falls through to a full parse.
+        """
+        try:
+            with open(path) as f:
+                prefix = f.read(4096)
+        except OSError:
+            return True
+        match = cls._kind_line_re.search(prefix)
+        if match is None:
+            return True
+        return match.group(1) == OPERATOR_CSV_KIND
 
 
 class ImageName(object):
+    # __slots__ cuts per-instance memory and makes attribute access faster; _str_cache
+    # lazily holds the canonical string form used by __str__/__hash__
+    __slots__ = ('registry', 'namespace', 'repo', 'tag', '_str_cache')
+
     def __init__(self, registry=None, namespace=None, repo=None, tag=None):
         self.registry = registry
         self.namespace = namespace
         self.repo = repo
         self.tag = tag or 'latest'
+        self._str_cache = None
 
     @classmethod
     def parse(cls, image_name):
-        result = cls()
-
         if isinstance(image_name, cls):
             log.debug("Attempting to parse ImageName %s as an ImageName", image_name)
             return image_name
 
-        # registry.org/namespace/repo:tag
-        s = image_name.split('/', 2)
-
-        if len(s) == 2:
-            if '.' in s[0] or ':' in s[0]:
-                result.registry = s[0]
-            else:
-                result.namespace = s[0]
-        elif len(s) == 3:
-            result.registry = s[0]
-            result.namespace = s[1]
-        result.repo = s[-1]
-
-        for sep in '@:':
-            try:
-                result.repo, result.tag = result.repo.rsplit(sep, 1)
-            except ValueError:
-                continue
-            break
-
-        return result
+        registry, namespace, repo, tag = _parse_image_name(image_name)
+        return cls(registry=registry, namespace=namespace, repo=repo, tag=tag)
 
     def to_str(self, registry=True, tag=True, explicit_tag=False,
                explicit_namespace=False):
+        # The default flags produce the canonical form, which __str__ and __hash__
+        # request over and over; it gets a specialized, cached implementation
+        if registry and tag and not explicit_tag and not explicit_namespace:
+            return self._canonical_str()
+
         if self.repo is None:
             raise RuntimeError('No image repository specified')
 
@@ -670,6 +988,21 @@ class ImageName(object):
 
         return result
 
+    def _canonical_str(self):
+        # Flat f-string build of the default to_str form, without the flag branches
+        result = self._str_cache
+        if result is None:
+            if self.repo is None:
+                raise RuntimeError('No image repository specified')
+            result = f'{self.namespace}/{self.repo}' if self.namespace else self.repo
+            if self.tag:
+                sep = '@' if ':' in self.tag else ':'
+                result = f'{result}{sep}{self.tag}'
+            if self.registry:
+                result = f'{self.registry}/{result}'
+            self._str_cache = result
+        return result
+
     def get_repo(self, explicit_namespace=False):
         result = self.repo
         if self.namespace:
@@ -688,21 +1021,25 @@ class ImageName(object):
 
         self.namespace = organization
         self.repo = '-'.join(repo_parts)
+        self._str_cache = None
 
     def __str__(self):
-        return self.to_str(registry=True, tag=True)
+        return self._canonical_str()
 
     def __repr__(self):
-        return "ImageName(image=%r)" % self.to_str()
+        return "ImageName(image=%r)" % self._canonical_str()
 
     def __eq__(self, other):
-        return type(self) == type(other) and self.__dict__ == other.__dict__
+        return isinstance(other, ImageName) and (
+            (self.registry, self.namespace, self.repo, self.tag)
+            == (other.registry, other.namespace, other.repo, other.tag)
+        )
 
     def __ne__(self, other):
         return not self == other
 
     def __hash__(self):
-        return hash(self.to_str())
+        return hash(self._canonical_str())
 
     def copy(self):
         return ImageName(
@@ -712,6 +1049,42 @@ class ImageName(object):
             tag=self.tag)
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_image_name(image_name):
+    """
+    Split a pullspec string into its (registry, namespace, repo, tag) parts.
+
+    Manifests commonly repeat the same pullspec across containers, env vars and
+    annotations, so the result is cached by input string. Only the immutable tuple is
+    cached; ImageName.parse builds a fresh instance from it every time, since ImageName
+    objects are mutable (see enclose).
+    """
+    registry = None
+    namespace = None
+    tag = None
+
+    # registry.org/namespace/repo:tag
+    s = image_name.split('/', 2)
+
+    if len(s) == 2:
+        if '.' in s[0] or ':' in s[0]:
+            registry = s[0]
+        else:
+            namespace = s[0]
+    elif len(s) == 3:
+        registry = s[0]
+        namespace = s[1]
+    repo = s[-1]
+
+    # A digest separator takes precedence; otherwise the tag starts at the last ':'
+    if '@' in repo:
+        repo, tag = repo.rsplit('@', 1)
+    elif ':' in repo:
+        repo, tag = repo.rsplit(':', 1)
+
+    return registry, namespace, repo, tag
+
+
 def chain_get(d, path, default=None):
     """
     Traverse nested dicts/lists (typically in data loaded from yaml/json)
@@ -725,10 +1098,21 @@ def chain_get(d, path, default=None):
     :return: Value found in data or `default`
     """
     obj = d
+    # Explicit dispatch instead of try/except: building an exception object per failed
+    # hop is far more expensive than these checks, and lookups that miss are common
     for key_or_index in path:
-        try:
+        if isinstance(obj, _DICT_TYPES):
+            obj = obj.get(key_or_index, _MISSING)
+            if obj is _MISSING:
+                return default
+        elif isinstance(obj, _LIST_TYPES):
+            if (
+                not isinstance(key_or_index, int)
+                or not -len(obj) <= key_or_index < len(obj)
+            ):
+                return default
             obj = obj[key_or_index]
-        except (IndexError, KeyError):
+        else:
             return default
     return obj
 
@@ -4,21 +4,37 @@ import hashlib
 import json
 import logging
 import os.path
+import re
 import subprocess
+import time
 
 
 logger = logging.getLogger(__name__)
 
 
+_SKOPEO_BASE_CMD = ('skopeo', '--command-timeout', '300s', 'inspect')
+
+# An image reference that is already pinned to a digest
+_DIGEST_RE = re.compile(r'.+@sha256:[0-9a-f]{64}$')
+
+
+@functools.lru_cache(maxsize=1024)
 def resolve_image_reference(image_reference, authfile=None):
     """
     Resolve the image reference to a digest image reference.
 
+    Results are cached for the lifetime of the process; resolving a reference that was
+    already resolved with the same authfile does not invoke skopeo again.
+
     :param str image_reference: the image reference of the container image to resolve
     :param str authfile: the path of the authentication file for registry communication.
     :return: the image reference resolved to a digest
     :rtype: str
     """
+    if _DIGEST_RE.match(image_reference):
+        logger.debug('%s is already pinned to a digest', image_reference)
+        return image_reference
+
     extra_args = []
     if authfile:
         if not os.path.exists(authfile):
@@ -40,7 +56,7 @@ def resolve_image_reference(image_reference, authfile=None):
         # issues until https://github.com/containers/skopeo/issues/785
         digest = json.loads(_skopeo_inspect(f'docker://{image_reference}', *extra_args))['Digest']
     resolved_image_reference = f'{name}@{digest}'
-    logger.debug('%s resolved to %s', image_reference, resolve_image_reference)
+    logger.debug('%s resolved to %s', image_reference, resolved_image_reference)
     return resolved_image_reference
 
 
@@ -57,14 +73,17 @@ def _get_container_image_name(image_reference):
         return image_reference.rsplit(':', 1)[0]
 
 
-def _retry(attempts=3, wait_on=Exception):
+def _retry(attempts=3, wait_on=Exception, delay=0.1):
     """
     Decorator to retry a function, or method, until success or max attempts are reached.
 
-    Note that there is no delay between attempts.
+    The delay between attempts grows exponentially, starting at ``delay`` seconds and
+    doubling after each failure; back-to-back retries tend to hit the same transient
+    registry error they just saw.
 
     :param int attempts: the total number of attempts to make before erroring out
     :param Exception wait_on: the exception on encountering which the function will be retried
+    :param float delay: the delay in seconds before the first retry
     :raises Exception: if the maximum attempts are reached
     """
 
@@ -72,6 +91,7 @@ def _retry(attempts=3, wait_on=Exception):
         @functools.wraps(function)
         def inner(*args, **kwargs):
             remaining_attempts = attempts
+            next_delay = delay
             while True:
                 try:
                     return function(*args, **kwargs)
@@ -79,6 +99,8 @@ def _retry(attempts=3, wait_on=Exception):
                     remaining_attempts -= 1
                     if remaining_attempts <= 0:
                         raise
+                    time.sleep(next_delay)
+                    next_delay *= 2
 
         return inner
 
@@ -100,8 +122,7 @@ def _skopeo_inspect(*args):
             exc_msg = f'Failed to inspect {arg}. Make sure it exists and is accessible.'
             break
 
-    skopeo_timeout = '300s'
-    cmd = ['skopeo', '--command-timeout', skopeo_timeout, 'inspect'] + list(args)
+    cmd = list(_SKOPEO_BASE_CMD) + list(args)
     return _run_cmd(cmd, exc_msg=exc_msg)
 
 
@@ -2,7 +2,6 @@
 import io
 import json
 import pytest
-from textwrap import dedent
 from unittest import mock
 
 from operator_manifest.cli import (
@@ -43,6 +42,40 @@ CSV_TEMPLATE_WITH_RELATED_IMAGES = (
 """
 )
 
+# `bacon` only appears as a RELATED_IMAGE_ environment variable, not in relatedImages
+CSV_TEMPLATE_WITH_RELATED_IMAGE_ENV = """\
+apiVersion: operators.coreos.com/v1alpha1
+kind: ClusterServiceVersion
+metadata:
+  name: foo
+spec:
+  install:
+    spec:
+      deployments:
+      - spec:
+          template:
+            spec:
+              containers:
+              - name: spam-operator
+                image: {spam}
+                env:
+                - name: RELATED_IMAGE_BACON
+                  value: {bacon}
+  relatedImages:
+  - name: spam-operator
+    image: {spam}
+  - name: eggs
+    image: {eggs}
+"""
+
+CSV_TEMPLATE_WITH_RELATED_IMAGE_ENV_REPLACED = (
+    CSV_TEMPLATE_WITH_RELATED_IMAGE_ENV
+    + """\
+  - name: bacon
+    image: {bacon}
+"""
+)
+
 CSV_RESOLVED_TEMPLATE = """\
 apiVersion: operators.coreos.com/v1alpha1
 kind: ClusterServiceVersion
@@ -261,63 +294,13 @@ class TestReplaceImageReferences:
         csv_path = manifest_dir / 'spam.yaml'
         # relatedImages is set and one of the containers uses an environment variable
         # with the suffix RELATED_IMAGE_. relatedImages section must be ignored and re-created.
-        original_csv_text = dedent(
-            # `bacon` missing in relatedImages
-            """\
-            apiVersion: operators.coreos.com/v1alpha1
-            kind: ClusterServiceVersion
-            metadata:
-              name: foo
-            spec:
-              install:
-                spec:
-                  deployments:
-                  - spec:
-                      template:
-                        spec:
-                          containers:
-                          - name: spam-operator
-                            image: {spam}
-                            env:
-                            - name: RELATED_IMAGE_BACON
-                              value: {bacon}
-              relatedImages:
-              - name: spam-operator
-                image: {spam}
-              - name: eggs
-                image: {eggs}
-        """
-        ).format(spam=spam_image_reference, eggs=eggs_image_reference, bacon=bacon_image_reference)
+        # `bacon` missing in relatedImages
+        original_csv_text = CSV_TEMPLATE_WITH_RELATED_IMAGE_ENV.format(
+            spam=spam_image_reference, eggs=eggs_image_reference, bacon=bacon_image_reference
+        )
         csv_path.write_text(original_csv_text)
 
-        replaced_csv_text = dedent(
-            """\
-            apiVersion: operators.coreos.com/v1alpha1
-            kind: ClusterServiceVersion
-            metadata:
-              name: foo
-            spec:
-              install:
-                spec:
-                  deployments:
-                  - spec:
-                      template:
-                        spec:
-                          containers:
-                          - name: spam-operator
-                            image: {spam}
-                            env:
-                            - name: RELATED_IMAGE_BACON
-                              value: {bacon}
-              relatedImages:
-              - name: spam-operator
-                image: {spam}
-              - name: eggs
-                image: {eggs}
-              - name: bacon
-                image: {bacon}
-        """
-        ).format(
+        replaced_csv_text = CSV_TEMPLATE_WITH_RELATED_IMAGE_ENV_REPLACED.format(
             spam=spam_image_reference_resolved,
             eggs=eggs_image_reference_resolved,
             bacon=bacon_image_reference_resolved,
@@ -539,14 +522,18 @@ class TestArgumentParsing:
     @mock.patch('operator_manifest.cli.extract_image_references')
     def test_extract_image_references(self, extract_image_references):
         main(['extract', 'my-manifest-dir'])
-        extract_image_references.assert_called_with('my-manifest-dir', output=mock.ANY)
+        extract_image_references.assert_called_with(
+            'my-manifest-dir', output=mock.ANY, round_trip=False
+        )
 
     @mock.patch('operator_manifest.cli.resolve_image_references')
     def test_resolve_image_references(self, resolve_image_references, tmp_path):
         images_file = tmp_path / 'images.json'
         images_file.write_text('')
         main(['resolve', str(images_file)])
-        resolve_image_references.assert_called_with(mock.ANY, authfile=None, output=mock.ANY)
+        resolve_image_references.assert_called_with(
+            mock.ANY, authfile=None, output=mock.ANY, jobs=None
+        )
         assert resolve_image_references.call_args[0][0].name == str(images_file)
 
     @mock.patch('operator_manifest.cli.replace_image_references')
@@ -565,6 +552,7 @@ class TestArgumentParsing:
             dry_run=False,
             output_extract=mock.ANY,
             output_replace=mock.ANY,
+            jobs=None,
         )
 
     def test_pin_disallow_stdout_for_output_replace(self, tmp_path):
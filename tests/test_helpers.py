@@ -1,6 +1,6 @@
 import pytest
 import jsonschema
-from flexmock import flexmock
+from unittest import mock
 
 from operator_manifest.helpers import load_schema, validate_with_schema, ValidationException
 import operator_manifest.helpers as helpers_module
@@ -76,9 +76,7 @@ def test_validate_with_schema_bad_schema(caplog, tmpdir):
             }
         }
     }
-    (flexmock(helpers_module)
-     .should_receive('load_schema')
-     .replace_with(lambda x: schema))
-    with pytest.raises(jsonschema.SchemaError):
-        validate_with_schema(data, 'foo')
+    with mock.patch.object(helpers_module, 'load_schema', return_value=schema):
+        with pytest.raises(jsonschema.SchemaError):
+            validate_with_schema(data, 'foo')
     assert 'invalid schema, cannot validate' in caplog.text
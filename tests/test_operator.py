@@ -954,6 +954,36 @@ class TestOperatorCSV(object):
         csv = OperatorCSV('original.yaml', data)
         assert csv.has_related_images() == does_have
 
+    @pytest.mark.parametrize('content, does_have', [
+        (dedent("""\
+            kind: ClusterServiceVersion
+            spec:
+              relatedImages:
+              - name: foo
+                image: registry.io/foo:1
+            """), True),
+        (dedent("""\
+            kind: ClusterServiceVersion
+            spec:
+              relatedImages: []
+            """), False),
+        (dedent("""\
+            kind: ClusterServiceVersion
+            spec:
+              install: {}
+            """), False),
+        (dedent("""\
+            kind: ClusterServiceVersion
+            metadata:
+              annotations:
+                relatedImages: not-the-real-section
+            """), False),
+    ])
+    def test_quick_has_related_images(self, content, does_have, tmpdir):
+        path = tmpdir.join('original.yaml')
+        path.write(content)
+        assert OperatorCSV.quick_has_related_images(str(path)) == does_have
+
     @pytest.mark.parametrize('var, does_have', [
         (None, False),
         ({'name': 'UNRELATED_IMAGE', 'value': 'foo'}, False),
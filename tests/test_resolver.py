@@ -6,6 +6,12 @@ from operator_manifest.resolver import resolve_image_reference
 
 
 class TestResolver:
+    @pytest.fixture(autouse=True)
+    def clear_resolver_cache(self):
+        # Many tests resolve the same image reference with different mocked skopeo
+        # output; results must not leak between them through the process-level cache
+        resolve_image_reference.cache_clear()
+
     @mock.patch('subprocess.run')
     def test_resolve_schema_version_2(self, subprocess_run):
         subprocess_run.return_value = mock.Mock(returncode=0, stdout='{"schemaVersion": 2}')
@@ -43,11 +49,11 @@ class TestResolver:
             'example.com/foo/bar@'
             'sha256:c5d902c53b4afcf32ad746fd9d696431650d3fbe8f7b10ca10519543fefd772c'
         )
-        # Note that the image reference being resolved is already resolved.
+        # Note that the image reference being resolved is already resolved,
+        # so skopeo is not invoked at all.
         resolved = resolve_image_reference(image_reference)
         assert resolved == image_reference
-        subprocess_run.assert_called_once()
-        assert '--raw' in subprocess_run.call_args[0][0]
+        subprocess_run.assert_not_called()
 
     @mock.patch('subprocess.run')
     def test_authfile_usage(self, subprocess_run, tmp_path):